@@ -1,4 +1,10 @@
+import base64
+import json
 import logging
+import os
+import re
+import time
+from collections import OrderedDict
 import jwt
 from jwt import PyJWTError, PyJWKClient
 
@@ -10,38 +16,129 @@ logger.setLevel(logging.INFO)
 # 키별로 클라이언트를 저장하여 다른 발급자의 토큰도 처리 가능
 jwks_clients = {}
 
+# JWKS에서 변환한 공개키 객체 캐시: (issuer, kid) -> (EllipticCurvePublicKey, 조회 시각)
+# PyJWKClient는 원본 JWKS만 캐싱하므로 매번 JWK를 cryptography 키 객체로 다시 만드는 비용을 없앱니다.
+# 키 교체·폐기가 반영되도록 JWKS 캐시와 같은 수명(초)이 지나면 다시 조회합니다.
+SIGNING_KEY_CACHE_TTL = 300
+SIGNING_KEY_CACHE_MAX_SIZE = 32
+signing_key_cache = OrderedDict()
+
+# 알고리즘 혼동 공격을 막기 위해 허용하는 서명 알고리즘을 ES256으로 고정합니다.
+ALLOWED_ALGORITHMS = ["ES256"]
+
+# 신뢰하는 발급자가 설정되어 있으면 미검증 페이로드를 파싱하지 않고 이 값으로 JWKS를 조회하며,
+# 검증 단계에서 토큰의 'iss'가 이 값과 일치하는지 확인합니다.
+SUPABASE_ISSUER = os.environ.get("SUPABASE_ISSUER") or None
+
+# 검증에 성공한 토큰을 캐싱하여 웜 호출 시 ES256 서명 검증을 건너뜁니다.
+# token -> (만료 시각, principal_id, authorizer_context)
+TOKEN_CACHE_TTL = 300
+TOKEN_CACHE_MAX_SIZE = 1024
+token_cache = OrderedDict()
+
+# methodArn에서 arn:aws:execute-api:{region}:{account_id}:{api_id}/{stage} 부분을 추출합니다.
+ARN_RE = re.compile(r"^arn:aws:execute-api:([^:]+):([^:]+):([^/]+)/([^/]+)")
+
+# 스테이지 단위 와일드카드 리소스 ARN 캐시: methodArn의 '{api_id}/{stage}'까지의 접두사 -> 리소스 ARN
+# api_id와 스테이지는 거의 바뀌지 않으므로 웜 호출에서는 정규식도 실행하지 않습니다.
+# 경로에는 게시글 ID 등이 들어가므로 키는 스테이지까지만 잘라 캐시가 커지지 않게 합니다.
+resource_cache = {}
+
+def get_resource_arn(method_arn):
+    """
+    REST API의 methodArn에서 스테이지까지만 남긴 와일드카드 리소스 ARN을 만듭니다.
+    파싱에 실패하면 None을 반환합니다.
+    """
+    stage_end = method_arn.find("/", method_arn.find("/") + 1)
+    cache_key = method_arn if stage_end == -1 else method_arn[:stage_end]
+    resource = resource_cache.get(cache_key)
+    if resource is None:
+        match = ARN_RE.match(method_arn)
+        if not match:
+            return None
+        # arn:aws:execute-api:{region}:{account_id}:{api_id}/{stage}/*
+        resource = f"{match[0]}/*"
+        resource_cache[cache_key] = resource
+    return resource
+
+def get_cached_token(token):
+    """
+    캐시된 토큰 검증 결과를 반환합니다. 만료된 항목은 조회 시점에 제거합니다.
+    """
+    entry = token_cache.get(token)
+    if entry is None:
+        return None
+    if entry[0] <= time.time():
+        del token_cache[token]
+        return None
+    token_cache.move_to_end(token)
+    return entry
+
+def cache_token(token, decoded, principal_id, authorizer_context):
+    """
+    검증된 토큰을 min(exp, 현재 시각 + TTL)까지 캐싱합니다. 최대 크기를 넘으면 가장 오래된 항목부터 제거합니다.
+    """
+    expires_at = min(decoded.get("exp", 0), time.time() + TOKEN_CACHE_TTL)
+    token_cache[token] = (expires_at, principal_id, authorizer_context)
+    token_cache.move_to_end(token)
+    while len(token_cache) > TOKEN_CACHE_MAX_SIZE:
+        token_cache.popitem(last=False)
+
+def get_unverified_issuer(token):
+    """
+    서명을 확인하지 않고 JWT 페이로드 세그먼트에서 발급자(iss)만 읽어옵니다.
+    """
+    try:
+        payload_b64 = token.split(".")[1]
+        payload_b64 += "=" * (-len(payload_b64) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload_b64)).get("iss")
+    except (IndexError, ValueError, AttributeError) as e:
+        raise PyJWTError(f"토큰 페이로드를 해석할 수 없습니다: {e}")
+
 def get_signing_key(token):
     """
     토큰의 발급자(iss)를 기반으로 JWKS 엔드포인트에서 서명 키를 가져옵니다.
-    PyJWKClient는 내부적으로 키를 캐싱하여 성능을 향상시킵니다.
+    변환된 공개키 객체는 (issuer, kid)별로 SIGNING_KEY_CACHE_TTL 동안 캐싱하여 웜 호출에서는 딕셔너리 조회만 수행합니다.
     """
     try:
         # 서명을 확인하지 않고 헤더를 먼저 가져옵니다.
         unverified_header = jwt.get_unverified_header(token)
+        if unverified_header.get("alg") not in ALLOWED_ALGORITHMS:
+            raise PyJWTError("허용되지 않은 서명 알고리즘입니다.")
         kid = unverified_header.get("kid")
         if not kid:
             raise PyJWTError("토큰 헤더에 'kid'가 없습니다.")
 
-        # 서명을 확인하지 않고 페이로드를 디코딩하여 'iss'를 얻습니다.
-        unverified_payload = jwt.decode(token, options={"verify_signature": False})
-        issuer = unverified_payload.get("iss")
+        # 발급자가 설정되어 있지 않으면 페이로드에서 'iss'만 직접 읽어옵니다.
+        issuer = SUPABASE_ISSUER or get_unverified_issuer(token)
         if not issuer:
             raise PyJWTError("토큰 페이로드에 'iss'가 없습니다.")
 
+        cache_key = (issuer, kid)
+        entry = signing_key_cache.get(cache_key)
+        if entry is not None:
+            if time.time() - entry[1] < SIGNING_KEY_CACHE_TTL:
+                signing_key_cache.move_to_end(cache_key)
+                return entry[0]
+            del signing_key_cache[cache_key]
+
         # 발급자별로 JWKS 클라이언트를 캐싱합니다.
         if issuer not in jwks_clients:
             jwks_url = f"{issuer}/.well-known/jwks.json"
-            logger.info(f"{issuer}에 대한 JWKS 클라이언트를 생성합니다. URL: {jwks_url}")
-            jwks_clients[issuer] = PyJWKClient(jwks_url)
+            logger.info("%s에 대한 JWKS 클라이언트를 생성합니다. URL: %s", issuer, jwks_url)
+            jwks_clients[issuer] = PyJWKClient(jwks_url, lifespan=SIGNING_KEY_CACHE_TTL)
         
         jwks_client = jwks_clients[issuer]
         
         # 토큰의 kid에 해당하는 서명 키를 가져옵니다.
         signing_key = jwks_client.get_signing_key_from_jwt(token)
+        signing_key_cache[cache_key] = (signing_key.key, time.time())
+        while len(signing_key_cache) > SIGNING_KEY_CACHE_MAX_SIZE:
+            signing_key_cache.popitem(last=False)
         return signing_key.key
 
     except (PyJWTError, Exception) as e:
-        logger.error(f"서명 키를 가져오는 데 실패했습니다: {e}")
+        logger.error("서명 키를 가져오는 데 실패했습니다: %s", e)
         raise
 
 def lambda_handler(event, context):
@@ -49,29 +146,16 @@ def lambda_handler(event, context):
     API Gateway Custom Authorizer의 메인 핸들러입니다.
     Authorization 헤더의 JWT를 검증하고 IAM 정책을 반환합니다.
     """
-    logger.info(f"Authorizer 이벤트 수신: {event}")
+    # 이벤트 전체에는 Authorization 헤더의 토큰이 포함되어 있으므로 로그에 남기지 않습니다.
+    logger.debug("Authorizer 요청 수신: %s", event.get("methodArn"))
 
     # 리소스 ARN 생성
-    try:
-        # REST API의 methodArn에서 스테이지까지만 추출하여 와일드카드 ARN 생성
-        method_arn = event.get("methodArn", "")
-        arn_parts = method_arn.split(":")
-        api_gateway_arn_parts = arn_parts[5].split("/")
-        
-        # arn:aws:execute-api:{region}:{account_id}:{api_id}/{stage}/*
-        region = arn_parts[3]
-        account_id = arn_parts[4]
-        api_id = api_gateway_arn_parts[0]
-        stage = api_gateway_arn_parts[1]
-        
-        resource = f"arn:aws:execute-api:{region}:{account_id}:{api_id}/{stage}/*"
-        logger.info(f"와일드카드 리소스 ARN을 생성했습니다: {resource}")
-
-    except (KeyError, AttributeError, IndexError):
+    method_arn = event.get("methodArn") or ""
+    resource = get_resource_arn(method_arn)
+    if resource is None:
         # ARN 파싱 실패 시, 들어온 methodArn을 그대로 사용하거나 전체 와일드카드로 대체
-        resource = event.get("methodArn", "*") 
-        logger.warning(f"methodArn 파싱에 실패하여 Resource ARN을 '{resource}'로 설정합니다.")
-
+        resource = method_arn or "*"
+        logger.warning("methodArn 파싱에 실패하여 Resource ARN을 '%s'로 설정합니다.", resource)
 
     # 대소문자를 구분하지 않고 Authorization 헤더를 찾습니다.
     headers = event.get("headers", {})
@@ -89,6 +173,12 @@ def lambda_handler(event, context):
     if token.lower().startswith("bearer "):
         token = token[7:]
 
+    # 이미 검증된 토큰이면 서명 검증 없이 캐시된 결과로 정책을 생성합니다.
+    cached = get_cached_token(token)
+    if cached:
+        _, principal_id, authorizer_context = cached
+        return generate_policy(principal_id, "Allow", resource, authorizer_context)
+
     try:
         # JWKS에서 올바른 공개키를 가져옵니다.
         public_key = get_signing_key(token)
@@ -98,9 +188,10 @@ def lambda_handler(event, context):
         decoded = jwt.decode(
             token,
             public_key,
-            algorithms=["ES256"],
+            algorithms=ALLOWED_ALGORITHMS,
             options={"verify_aud": True},
             audience="authenticated",
+            issuer=SUPABASE_ISSUER,
         )
 
         principal_id = decoded.get("sub")
@@ -108,7 +199,7 @@ def lambda_handler(event, context):
             logger.warning("토큰에 'sub' 클레임이 없습니다.")
             raise PyJWTError("Invalid token claims")
 
-        logger.info(f"토큰이 성공적으로 검증되었습니다. 사용자 ID: {principal_id}")
+        logger.info("토큰이 성공적으로 검증되었습니다. 사용자 ID: %s", principal_id)
         
         # 후속 Lambda 함수에 전달할 컨텍스트를 생성합니다.
         user_metadata = decoded.get("user_metadata", {})
@@ -122,14 +213,15 @@ def lambda_handler(event, context):
             "full_name": str(full_name or ''), # Google 닉네임을 컨텍스트에 추가
             "profile_image_url": str(avatar_url or ''), # 프로필 이미지 URL 추가
         }
-        
+
+        cache_token(token, decoded, principal_id, authorizer_context)
         return generate_policy(principal_id, "Allow", resource, authorizer_context)
 
     except PyJWTError as e:
-        logger.error(f"JWT 검증 실패: {e}")
+        logger.error("JWT 검증 실패: %s", e)
         return generate_policy("user", "Deny", resource, context={"error": str(e)})
     except Exception as e:
-        logger.error(f"Authorizer 처리 중 예외 발생: {e}")
+        logger.error("Authorizer 처리 중 예외 발생: %s", e)
         return generate_policy("user", "Deny", resource, context={"error": "Internal server error"})
 
 def generate_policy(principal_id, effect, resource, context=None):
@@ -152,5 +244,5 @@ def generate_policy(principal_id, effect, resource, context=None):
     if context:
         policy["context"] = context
 
-    logger.info(f"생성된 정책: {policy}")
+    logger.debug("생성된 정책: %s", policy)
     return policy
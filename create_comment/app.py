@@ -1,149 +1,95 @@
-import json
 import logging
-import os
-import psycopg2
-from psycopg2 import extras
-import boto3
-from datetime import datetime
-import uuid
+import orjson
+import psycopg
+from tarot_common.db import run_with_reconnect
+from tarot_common.http import JSON_HEADERS, load_json_body
 
 # 로거 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# 전역 변수로 DB 및 SQS 정보 관리
-db_conn = None
-db_conn_string = None
-sqs_queue_url = None
-ssm_client = None
-
-DB_CONN_STRING_PARAM_PATH = os.environ.get("DB_CONN_STRING_PARAM_PATH")
-SQS_QUEUE_URL_PARAM_PATH = os.environ.get("SQS_QUEUE_URL_PARAM_PATH")
-
-def get_ssm_parameter(param_path):
-    """Parameter Store에서 파라미터 값을 가져옵니다."""
-    global ssm_client
-    if not param_path:
-        raise ValueError(f"{param_path} 환경 변수가 설정되지 않았습니다.")
-    
-    if ssm_client is None:
-        ssm_client = boto3.client("ssm")
-    
-    logger.info(f"Parameter Store에서 '{param_path}' 값을 가져옵니다.")
-    parameter = ssm_client.get_parameter(Name=param_path, WithDecryption=True)
-    return parameter["Parameter"]["Value"]
-
-def get_db_connection_string():
-    """Parameter Store에서 데이터베이스 연결 문자열을 가져옵니다."""
-    global db_conn_string
-    if db_conn_string: return db_conn_string
-    db_conn_string = get_ssm_parameter(DB_CONN_STRING_PARAM_PATH)
-    return db_conn_string
-
-def get_sqs_queue_url():
-    """Parameter Store에서 SQS 큐 URL을 가져옵니다."""
-    global sqs_queue_url
-    if sqs_queue_url: return sqs_queue_url
-    sqs_queue_url = get_ssm_parameter(SQS_QUEUE_URL_PARAM_PATH)
-    return sqs_queue_url
-
-def get_db_connection():
-    """데이터베이스 연결을 가져오고, 필요한 경우 새로 생성합니다."""
-    global db_conn
-    if db_conn:
-        try:
-            db_conn.cursor().execute("SELECT 1")
-            return db_conn
-        except psycopg2.OperationalError:
-            db_conn = None
-    
-    conn_string = get_db_connection_string()
-    db_conn = psycopg2.connect(conn_string)
-    db_conn.autocommit = True
-    return db_conn
+ERR_NO_POST_ID = {"statusCode": 400, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "post_id is required in path"}).decode()}
+ERR_NO_CONTENT = {"statusCode": 400, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "Comment content is required"}).decode()}
+ERR_BAD_JSON = {"statusCode": 400, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "Invalid JSON format in request body"}).decode()}
+ERR_NO_USER = {"statusCode": 401, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "User ID not found in token"}).decode()}
+ERR_DB = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "Database error occurred"}).decode()}
+ERR_UNEXPECTED = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "An unexpected error occurred"}).decode()}
 
 def lambda_handler(event, context):
     """
-    특정 게시글에 새로운 댓글을 작성하고 SQS로 메시지를 보냅니다.
+    특정 게시글에 새로운 댓글을 작성하고, 같은 트랜잭션에서 SQS로 보낼 메시지를 outbox에 기록합니다.
+    outbox에 쌓인 메시지는 DrainCommentOutboxFunction이 주기적으로 SQS에 전송합니다.
     """
-    logger.info(f"Request received: {event}")
+    logger.debug("Request received: %s", event)
     
     try:
         # 1. Authorizer로부터 사용자 ID 추출
         authorizer_context = event.get('requestContext', {}).get('authorizer', {})
         user_id = authorizer_context.get('user_id')
         if not user_id:
-            return {"statusCode": 401, "body": json.dumps({"error": "User ID not found in token"})}
+            return ERR_NO_USER
 
         # 2. 경로 파라미터에서 'post_id' 추출
         path_params = event.get('pathParameters')
         if not path_params or 'post_id' not in path_params:
-            return {"statusCode": 400, "body": json.dumps({"error": "post_id is required in path"})}
+            return ERR_NO_POST_ID
         post_id = path_params['post_id']
 
         # 3. 요청 Body에서 댓글 내용(content) 추출
         try:
-            body = json.loads(event.get("body", "{}"))
+            body = load_json_body(event)
             content = body.get('content')
             if not content or not content.strip():
-                return {"statusCode": 400, "body": json.dumps({"error": "Comment content is required"})}
-        except json.JSONDecodeError:
-            return {"statusCode": 400, "body": json.dumps({"error": "Invalid JSON format in request body"})}
-
-        # 4. 데이터베이스에 댓글 저장
-        conn = get_db_connection()
-        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-            insert_query = """
-                INSERT INTO public.comments (post_id, user_id, content)
-                VALUES (%s, %s, %s)
-                RETURNING id, created_at;
-            """
-            cursor.execute(insert_query, (post_id, user_id, content))
-            new_comment_data = cursor.fetchone()
-
-        new_comment_id = str(new_comment_data['id'])
-        new_comment_created_at = new_comment_data['created_at']
-        logger.info(f"새로운 댓글 생성 완료. ID: {new_comment_id}")
-
-        # 5. SQS에 메시지 전송
-        try:
-            queue_url = get_sqs_queue_url()
-            message_body = {
-                "comment_id": new_comment_id,
-                "content": content,
-                "user_id": user_id,
-                "lang": "ko",
-                "created_at": new_comment_created_at.isoformat()
-            }
-            
-            sqs_client = boto3.client("sqs")
-            sqs_client.send_message(
-                QueueUrl=queue_url,
-                MessageBody=json.dumps(message_body, default=str)
-            )
-            logger.info(f"SQS에 메시지 전송 완료. Comment ID: {new_comment_id}")
-
-        except Exception as e:
-            # SQS 전송 실패가 API 응답에 영향을 주지 않도록 로깅만 처리
-            logger.error(f"SQS 메시지 전송 실패: {e}", exc_info=True)
-
-        # 6. 성공 응답 반환
+                return ERR_NO_CONTENT
+        except ValueError:
+            return ERR_BAD_JSON
+
+        # 4. 데이터베이스에 댓글과 SQS 메시지(outbox)를 한 문장으로 저장
+        def insert_comment(conn):
+            with conn.cursor(binary=True) as cursor:
+                insert_query = """
+                    WITH new_comment AS (
+                        INSERT INTO public.comments (post_id, user_id, content)
+                        VALUES (%(post_id)s, %(user_id)s, %(content)s)
+                        RETURNING id, created_at
+                    ), outbox AS (
+                        INSERT INTO public.comment_outbox (comment_id, payload)
+                        SELECT
+                            id,
+                            jsonb_build_object(
+                                'comment_id', id::text,
+                                'content', %(content)s::text,
+                                'user_id', %(user_id)s::text,
+                                'lang', 'ko',
+                                'created_at', created_at
+                            )
+                        FROM new_comment
+                    )
+                    SELECT id, created_at FROM new_comment;
+                """
+                cursor.execute(insert_query, {"post_id": post_id, "user_id": user_id, "content": content})
+                return cursor.fetchone()
+
+        # 단일 행만 반환되므로 dict 대신 기본 튜플 행을 그대로 언패킹합니다.
+        new_comment_id, new_comment_created_at = run_with_reconnect(insert_comment)
+        new_comment_id = str(new_comment_id)
+
+        logger.info("새로운 댓글 생성 완료. ID: %s", new_comment_id)
+
+        # 5. 성공 응답 반환
         return {
             "statusCode": 201,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-            },
-            "body": json.dumps({
+            "headers": JSON_HEADERS,
+            "body": orjson.dumps({
                 "message": "Comment created successfully",
                 "comment_id": new_comment_id,
-                "created_at": new_comment_created_at.isoformat()
-            }),
+                "created_at": new_comment_created_at
+            }).decode(),
         }
 
-    except psycopg2.Error as e:
-        logger.error(f"데이터베이스 오류 발생: {e}", exc_info=True)
-        return {"statusCode": 500, "body": json.dumps({"error": "Database error occurred"})}
+    except psycopg.Error as e:
+        logger.error("데이터베이스 오류 발생: %s", e, exc_info=True)
+        return ERR_DB
     except Exception as e:
-        logger.error(f"처리 중 예외 발생: {e}", exc_info=True)
-        return {"statusCode": 500, "body": json.dumps({"error": "An unexpected error occurred"})}
+        logger.error("처리 중 예외 발생: %s", e, exc_info=True)
+        return ERR_UNEXPECTED
@@ -1,98 +1,74 @@
-import json
 import logging
-import os
-import psycopg2
-from psycopg2 import extras
+import orjson
+import psycopg
 import uuid
+from tarot_common.db import run_with_reconnect
+from tarot_common.http import JSON_HEADERS, get_raw_body
 
-# get_profile/app.py와 동일한 DB 연결 로직을 가져옵니다.
-# ---------------------------------------------------
+# 로거 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-db_conn = None
-db_conn_string = None
-ssm_client = None
-DB_CONN_STRING_PARAM_PATH = os.environ.get("DB_CONN_STRING_PARAM_PATH")
-
-def get_db_connection_string():
-    global db_conn_string, ssm_client
-    if db_conn_string: return db_conn_string
-    if not DB_CONN_STRING_PARAM_PATH: raise ValueError("DB_CONN_STRING_PARAM_PATH 환경 변수가 설정되지 않았습니다.")
-    
-    import boto3
-    if ssm_client is None: ssm_client = boto3.client("ssm")
-    
-    logger.info("Parameter Store에서 DB 연결 문자열을 가져옵니다.")
-    parameter = ssm_client.get_parameter(Name=DB_CONN_STRING_PARAM_PATH, WithDecryption=True)
-    db_conn_string = parameter["Parameter"]["Value"]
-    return db_conn_string
-
-def get_db_connection():
-    global db_conn
-    if db_conn:
-        try:
-            db_conn.cursor().execute("SELECT 1")
-            return db_conn
-        except psycopg2.OperationalError:
-            db_conn = None
-    
-    conn_string = get_db_connection_string()
-    db_conn = psycopg2.connect(conn_string)
-    db_conn.autocommit = True
-    return db_conn
-# ---------------------------------------------------
+ERR_BAD_JSON = {"statusCode": 400, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "Invalid JSON format in request body"}).decode()}
+ERR_NO_READING = {"statusCode": 400, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "Reading data is required in the body"}).decode()}
+ERR_NO_USER = {"statusCode": 401, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "User ID not found in token"}).decode()}
+ERR_UNEXPECTED = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "An unexpected error occurred"}).decode()}
 
 def lambda_handler(event, context):
     """
     타로 리딩 결과를 DB에 저장하고 공유 ID를 반환합니다.
     """
-    logger.info(f"Request received: {event}")
+    logger.debug("Request received: %s", event)
     
-    conn = None
     try:
         # 1. Authorizer로부터 사용자 ID 추출
         authorizer_context = event.get('requestContext', {}).get('authorizer', {})
         user_id = authorizer_context.get('user_id')
 
         if not user_id:
-            return {"statusCode": 401, "body": json.dumps({"error": "User ID not found in token"})}
+            return ERR_NO_USER
 
-        # 2. 요청 Body에서 타로 리딩 데이터 추출
+        # 2. 요청 Body의 타로 리딩 데이터는 Python에서 파싱하지 않고 그대로 DB에 전달
         try:
-            reading_data = json.loads(event.get("body", "{}"))
-            if not reading_data:
-                return {"statusCode": 400, "body": json.dumps({"error": "Reading data is required in the body"})}
-        except json.JSONDecodeError:
-            return {"statusCode": 400, "body": json.dumps({"error": "Invalid JSON format in request body"})}
+            reading_body = get_raw_body(event)
+        except ValueError:
+            return ERR_BAD_JSON
 
-        # 3. 데이터베이스에 저장
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        # 3. 데이터베이스에 저장 (JSON 검증과 jsonb 변환은 DB에서 수행)
+        def insert_reading(conn):
+            with conn.cursor() as cursor:
+                # 비어 있는 리딩 데이터({}, [], null 등)는 저장하지 않음
+                insert_query = """
+                    INSERT INTO public.shared_readings (reading_data, user_id)
+                    SELECT r.reading_data, %(user_id)s
+                    FROM (SELECT %(body)s::jsonb AS reading_data) AS r
+                    WHERE r.reading_data NOT IN (
+                        '{}'::jsonb, '[]'::jsonb, 'null'::jsonb, '""'::jsonb, 'false'::jsonb, '0'::jsonb
+                    )
+                    RETURNING id;
+                """
+                cursor.execute(insert_query, {"body": reading_body, "user_id": user_id})
+                row = cursor.fetchone()
+                return row[0] if row else None
+
+        try:
+            new_share_id = run_with_reconnect(insert_reading)
+        except psycopg.errors.InvalidTextRepresentation:
+            # 잘못된 JSON은 jsonb 변환 단계에서 DB가 거부함
+            return ERR_BAD_JSON
 
-        insert_query = """
-            INSERT INTO public.shared_readings (reading_data, user_id)
-            VALUES (%s, %s)
-            RETURNING id;
-        """
-        # reading_data를 JSON 문자열로 변환하여 저장
-        cursor.execute(insert_query, (json.dumps(reading_data), user_id))
-        
-        new_share_id = cursor.fetchone()[0]
-        logger.info(f"새로운 공유 리딩 생성 완료. ID: {new_share_id}")
+        if new_share_id is None:
+            return ERR_NO_READING
 
-        cursor.close()
+        logger.info("새로운 공유 리딩 생성 완료. ID: %s", new_share_id)
 
         # 4. 성공 응답 반환
         return {
             "statusCode": 201, # 201 Created
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-            },
-            "body": json.dumps({"share_id": str(new_share_id)}),
+            "headers": JSON_HEADERS,
+            "body": orjson.dumps({"share_id": str(new_share_id)}).decode(),
         }
 
     except Exception as e:
-        logger.error(f"처리 중 예외 발생: {e}", exc_info=True)
-        return {"statusCode": 500, "body": json.dumps({"error": "An unexpected error occurred"})}
+        logger.error("처리 중 예외 발생: %s", e, exc_info=True)
+        return ERR_UNEXPECTED
@@ -0,0 +1,103 @@
+import logging
+import os
+import orjson
+import psycopg
+import boto3
+from tarot_common.aws import get_ssm_parameter
+from tarot_common.db import run_with_reconnect
+
+# 로거 설정
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+ERR_DB = {"statusCode": 500, "body": orjson.dumps({"error": "Database error occurred"}).decode()}
+ERR_UNEXPECTED = {"statusCode": 500, "body": orjson.dumps({"error": "An unexpected error occurred"}).decode()}
+
+SQS_QUEUE_URL_PARAM_PATH = os.environ.get("SQS_QUEUE_URL_PARAM_PATH")
+
+# SendMessageBatch 한 번에 보낼 수 있는 최대 메시지 수
+BATCH_SIZE = 10
+# 한 번의 실행에서 처리할 최대 배치 수 (Lambda 타임아웃 보호)
+MAX_BATCHES_PER_RUN = 50
+
+# AWS 클라이언트는 모듈 로드 시 한 번만 생성하여 호출 간에 HTTPS 세션을 재사용합니다.
+try:
+    sqs_client = boto3.client("sqs")
+except Exception as e:
+    logger.error("SQS 클라이언트 생성 실패: %s", e)
+    sqs_client = None
+
+def get_sqs_queue_url():
+    """Parameter Store에서 SQS 큐 URL을 가져옵니다."""
+    if not SQS_QUEUE_URL_PARAM_PATH:
+        raise ValueError("SQS_QUEUE_URL_PARAM_PATH 환경 변수가 설정되지 않았습니다.")
+    return get_ssm_parameter(SQS_QUEUE_URL_PARAM_PATH)
+
+def drain_batch(conn, queue_url):
+    """
+    outbox에서 최대 BATCH_SIZE개의 메시지를 잠근 뒤 SQS로 한 번에 전송하고, 전송에 성공한 행을 삭제합니다.
+    (전송된 개수, 가져온 개수)를 반환합니다.
+    """
+    with conn.transaction(), conn.cursor() as cursor:
+        # 여러 실행이 겹쳐도 같은 메시지를 중복 전송하지 않도록 SKIP LOCKED로 행을 나눠 가집니다.
+        cursor.execute("""
+            SELECT id, payload
+            FROM public.comment_outbox
+            ORDER BY id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED;
+        """, (BATCH_SIZE,))
+        rows = cursor.fetchall()
+        if not rows:
+            return 0, 0
+
+        response = sqs_client.send_message_batch(
+            QueueUrl=queue_url,
+            Entries=[
+                {"Id": str(outbox_id), "MessageBody": orjson.dumps(payload).decode()}
+                for outbox_id, payload in rows
+            ],
+        )
+
+        for failed in response.get("Failed", []):
+            logger.error("SQS 메시지 전송 실패 (outbox ID: %s): %s", failed['Id'], failed.get('Message'))
+
+        sent_ids = [int(entry["Id"]) for entry in response.get("Successful", [])]
+        if sent_ids:
+            cursor.execute("DELETE FROM public.comment_outbox WHERE id = ANY(%s);", (sent_ids,))
+
+        return len(sent_ids), len(rows)
+
+def lambda_handler(event, context):
+    """
+    comment_outbox에 쌓인 댓글 메시지를 배치 단위로 SQS에 전송합니다. (EventBridge 스케줄로 실행)
+    """
+    logger.info("댓글 outbox 전송을 시작합니다.")
+
+    try:
+        queue_url = get_sqs_queue_url()
+        total_sent = 0
+
+        for _ in range(MAX_BATCHES_PER_RUN):
+            sent, fetched = run_with_reconnect(lambda conn: drain_batch(conn, queue_url))
+            total_sent += sent
+            # 남은 메시지가 없거나, 배치 전체가 실패한 경우 다음 실행으로 넘깁니다.
+            if fetched < BATCH_SIZE or sent == 0:
+                break
+
+        logger.info("총 %s개의 댓글 메시지를 SQS에 전송했습니다.", total_sent)
+
+        return {
+            "statusCode": 200,
+            "body": orjson.dumps({
+                "message": "Comment outbox drained.",
+                "sent_messages": total_sent
+            }).decode()
+        }
+
+    except psycopg.Error as e:
+        logger.error("데이터베이스 오류 발생: %s", e, exc_info=True)
+        return ERR_DB
+    except Exception as e:
+        logger.error("처리 중 예외 발생: %s", e, exc_info=True)
+        return ERR_UNEXPECTED
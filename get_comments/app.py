@@ -1,106 +1,71 @@
-import json
 import logging
-import os
-import psycopg2
-from psycopg2 import extras
+import orjson
+import psycopg
+from psycopg.rows import dict_row
+from tarot_common.db import run_with_reconnect
+from tarot_common.http import JSON_HEADERS
 
 # 로거 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# 전역 변수로 DB 연결 관리
-db_conn = None
-db_conn_string = None
-ssm_client = None
-DB_CONN_STRING_PARAM_PATH = os.environ.get("DB_CONN_STRING_PARAM_PATH")
-
-def get_db_connection_string():
-    """Parameter Store에서 데이터베이스 연결 문자열을 가져옵니다."""
-    global db_conn_string, ssm_client
-    if db_conn_string: return db_conn_string
-    if not DB_CONN_STRING_PARAM_PATH: raise ValueError("DB_CONN_STRING_PARAM_PATH 환경 변수가 설정되지 않았습니다.")
-    
-    import boto3
-    if ssm_client is None: ssm_client = boto3.client("ssm")
-    
-    logger.info("Parameter Store에서 DB 연결 문자열을 가져옵니다.")
-    parameter = ssm_client.get_parameter(Name=DB_CONN_STRING_PARAM_PATH, WithDecryption=True)
-    db_conn_string = parameter["Parameter"]["Value"]
-    return db_conn_string
-
-def get_db_connection():
-    """데이터베이스 연결을 가져오고, 필요한 경우 새로 생성합니다."""
-    global db_conn
-    if db_conn:
-        try:
-            db_conn.cursor().execute("SELECT 1")
-            return db_conn
-        except psycopg2.OperationalError:
-            db_conn = None
-    
-    conn_string = get_db_connection_string()
-    db_conn = psycopg2.connect(conn_string)
-    db_conn.autocommit = True
-    return db_conn
+ERR_NO_POST_ID = {"statusCode": 400, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "post_id is required in path"}).decode()}
+ERR_DB = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "Database error occurred"}).decode()}
+ERR_UNEXPECTED = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "An unexpected error occurred"}).decode()}
 
 def lambda_handler(event, context):
     """
     특정 게시글에 달린 댓글 목록을 조회하여 반환합니다.
     """
-    logger.info(f"Request received: {event}")
+    logger.debug("Request received: %s", event)
     
     try:
         # 1. 경로 파라미터에서 'post_id' 추출
         path_params = event.get('pathParameters')
         if not path_params or 'post_id' not in path_params:
-            return {"statusCode": 400, "body": json.dumps({"error": "post_id is required in path"})}
+            return ERR_NO_POST_ID
         
         post_id = path_params['post_id']
 
         # 2. 데이터베이스에서 댓글 목록 조회
-        conn = get_db_connection()
-        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-            # users 테이블과 JOIN하여 작성자 닉네임과 프로필 이미지 URL도 함께 가져옴
-            # is_deleted가 false인 댓글만 생성 시간 오름차순으로 정렬
-            fetch_query = """
-                SELECT
-                    c.id,
-                    c.content,
-                    c.created_at,
-                    c.user_id,
-                    c.is_deleted,
-                    c.is_purified,
-                    u.nickname,
-                    u.profile_image_url
-                FROM public.comments c
-                JOIN public.users u ON c.user_id = u.id
-                WHERE c.post_id = %s
-                ORDER BY c.created_at ASC;
-            """
-            cursor.execute(fetch_query, (post_id,))
-            comments = cursor.fetchall()
+        def fetch_comments(conn):
+            # binary=True: uuid/timestamptz 값을 텍스트 파싱 없이 바이너리 형식으로 받습니다.
+            with conn.cursor(row_factory=dict_row, binary=True) as cursor:
+                # users 테이블과 JOIN하여 작성자 닉네임과 프로필 이미지 URL도 함께 가져옴
+                # is_deleted가 false인 댓글만 생성 시간 오름차순으로 정렬
+                fetch_query = """
+                    SELECT
+                        c.id,
+                        c.content,
+                        c.created_at,
+                        c.user_id,
+                        c.is_deleted,
+                        c.is_purified,
+                        u.nickname,
+                        u.profile_image_url
+                    FROM public.comments c
+                    JOIN public.users u ON c.user_id = u.id
+                    WHERE c.post_id = %s
+                    ORDER BY c.created_at ASC;
+                """
+                cursor.execute(fetch_query, (post_id,))
+                return cursor.fetchall()
 
-        # id와 datetime 객체를 문자열로 변환
-        for comment in comments:
-            comment['id'] = str(comment['id'])
-            comment['user_id'] = str(comment['user_id'])
-            comment['created_at'] = comment['created_at'].isoformat()
-        
-        logger.info(f"{len(comments)}개의 댓글을 조회했습니다 (Post ID: {post_id}).")
+        comments = run_with_reconnect(fetch_comments)
+
+        # id와 datetime 객체는 orjson이 직접 문자열로 직렬화합니다.
+        logger.info("%s개의 댓글을 조회했습니다 (Post ID: %s).", len(comments), post_id)
 
         # 3. 성공 응답 반환
         return {
             "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-            },
-            "body": json.dumps(comments),
+            "headers": JSON_HEADERS,
+            "body": orjson.dumps(comments).decode(),
         }
 
-    except psycopg2.Error as e:
-        logger.error(f"데이터베이스 오류 발생: {e}", exc_info=True)
-        return {"statusCode": 500, "body": json.dumps({"error": "Database error occurred"})}
+    except psycopg.Error as e:
+        logger.error("데이터베이스 오류 발생: %s", e, exc_info=True)
+        return ERR_DB
     except Exception as e:
-        logger.error(f"처리 중 예외 발생: {e}", exc_info=True)
-        return {"statusCode": 500, "body": json.dumps({"error": "An unexpected error occurred"})}
+        logger.error("처리 중 예외 발생: %s", e, exc_info=True)
+        return ERR_UNEXPECTED
@@ -1,109 +1,89 @@
-import json
 import logging
-import os
-import psycopg2
-from psycopg2 import extras
+import orjson
+import psycopg
+from tarot_common.db import run_with_reconnect
+from tarot_common.http import JSON_HEADERS
 
 # 로거 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# 전역 변수로 DB 연결 관리
-db_conn = None
-db_conn_string = None
-ssm_client = None
-DB_CONN_STRING_PARAM_PATH = os.environ.get("DB_CONN_STRING_PARAM_PATH")
-
-def get_db_connection_string():
-    """Parameter Store에서 데이터베이스 연결 문자열을 가져옵니다."""
-    global db_conn_string, ssm_client
-    if db_conn_string:
-        return db_conn_string
-    if not DB_CONN_STRING_PARAM_PATH:
-        raise ValueError("DB_CONN_STRING_PARAM_PATH 환경 변수가 설정되지 않았습니다.")
-    
-    import boto3
-    if ssm_client is None:
-        ssm_client = boto3.client("ssm")
-    
-    logger.info("Parameter Store에서 DB 연결 문자열을 가져옵니다.")
-    parameter = ssm_client.get_parameter(Name=DB_CONN_STRING_PARAM_PATH, WithDecryption=True)
-    db_conn_string = parameter["Parameter"]["Value"]
-    return db_conn_string
-
-def get_db_connection():
-    """데이터베이스 연결을 가져오고, 필요한 경우 새로 생성합니다."""
-    global db_conn
-    if db_conn:
-        try:
-            db_conn.cursor().execute("SELECT 1")
-            return db_conn
-        except psycopg2.OperationalError:
-            db_conn = None
-    
-    conn_string = get_db_connection_string()
-    db_conn = psycopg2.connect(conn_string)
-    db_conn.autocommit = True
-    return db_conn
+ERR_NO_POST_ID = {"statusCode": 400, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "post_id is required in path"}).decode()}
+ERR_POST_NOT_FOUND = {"statusCode": 404, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "Post not found"}).decode()}
+ERR_DB = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "Database error occurred"}).decode()}
+ERR_UNEXPECTED = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "An unexpected error occurred"}).decode()}
 
 def lambda_handler(event, context):
     """
-    특정 ID의 게시글 하나를 조회하여 반환합니다.
+    특정 ID의 게시글 하나를 댓글 목록과 함께 조회하여 반환합니다.
     """
-    logger.info(f"Request received: {event}")
+    logger.debug("Request received: %s", event)
     
     try:
         # 1. 경로 파라미터에서 'post_id' 추출
         path_params = event.get('pathParameters')
         if not path_params or 'post_id' not in path_params:
-            return {"statusCode": 400, "body": json.dumps({"error": "post_id is required in path"})}
+            return ERR_NO_POST_ID
         
         post_id = path_params['post_id']
 
-        # 2. 데이터베이스에서 특정 게시글 조회
-        conn = get_db_connection()
-        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-            # users 테이블과 JOIN하여 작성자 닉네임과 프로필 이미지 URL도 함께 가져옴
-            fetch_query = """
-                SELECT
-                    p.id,
-                    p.title,
-                    p.content,
-                    p.created_at,
-                    p.user_id,
-                    u.nickname,
-                    u.profile_image_url
-                FROM public.posts p
-                JOIN public.users u ON p.user_id = u.id
-                WHERE p.id = %s AND p.is_deleted = FALSE;
-            """
-            cursor.execute(fetch_query, (post_id,))
-            post = cursor.fetchone()
+        # 2. 데이터베이스에서 특정 게시글과 댓글 목록을 한 번에 조회
+        def fetch_post(conn):
+            with conn.cursor() as cursor:
+                # users 테이블과 JOIN하여 작성자 닉네임과 프로필 이미지 URL도 함께 가져옴
+                # 댓글 목록은 get_comments와 같은 형태로 생성 시간 오름차순 정렬
+                # 응답 JSON은 DB에서 완성된 문자열로 만들어 그대로 반환
+                fetch_query = """
+                    SELECT json_build_object(
+                        'id', p.id,
+                        'title', p.title,
+                        'content', p.content,
+                        'created_at', p.created_at,
+                        'user_id', p.user_id,
+                        'nickname', u.nickname,
+                        'profile_image_url', u.profile_image_url,
+                        'comments', COALESCE((
+                            SELECT json_agg(json_build_object(
+                                'id', c.id,
+                                'content', c.content,
+                                'created_at', c.created_at,
+                                'user_id', c.user_id,
+                                'is_deleted', c.is_deleted,
+                                'is_purified', c.is_purified,
+                                'nickname', cu.nickname,
+                                'profile_image_url', cu.profile_image_url
+                            ) ORDER BY c.created_at ASC)
+                            FROM public.comments c
+                            JOIN public.users cu ON c.user_id = cu.id
+                            WHERE c.post_id = p.id
+                        ), '[]'::json)
+                    )::text
+                    FROM public.posts p
+                    JOIN public.users u ON p.user_id = u.id
+                    WHERE p.id = %s AND p.is_deleted = FALSE;
+                """
+                cursor.execute(fetch_query, (post_id,))
+                row = cursor.fetchone()
+                return row[0] if row else None
+
+        post_json = run_with_reconnect(fetch_post)
 
         # 3. 게시글이 없는 경우 404 반환
-        if not post:
-            return {"statusCode": 404, "body": json.dumps({"error": "Post not found"})}
+        if not post_json:
+            return ERR_POST_NOT_FOUND
 
-        # id(uuid)와 created_at(datetime)을 문자열로 변환
-        post['id'] = str(post['id'])
-        post['user_id'] = str(post['user_id'])
-        post['created_at'] = post['created_at'].isoformat()
-        
-        logger.info(f"게시글 조회 성공. ID: {post_id}")
+        logger.info("게시글 조회 성공. ID: %s", post_id)
 
         # 4. 성공 응답 반환
         return {
             "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-            },
-            "body": json.dumps(post),
+            "headers": JSON_HEADERS,
+            "body": post_json,
         }
 
-    except psycopg2.Error as e:
-        logger.error(f"데이터베이스 오류 발생: {e}", exc_info=True)
-        return {"statusCode": 500, "body": json.dumps({"error": "Database error occurred"})}
+    except psycopg.Error as e:
+        logger.error("데이터베이스 오류 발생: %s", e, exc_info=True)
+        return ERR_DB
     except Exception as e:
-        logger.error(f"처리 중 예외 발생: {e}", exc_info=True)
-        return {"statusCode": 500, "body": json.dumps({"error": "An unexpected error occurred"})}
+        logger.error("처리 중 예외 발생: %s", e, exc_info=True)
+        return ERR_UNEXPECTED
@@ -1,114 +1,125 @@
-import json
+import base64
 import logging
-import os
-import psycopg2
-from psycopg2 import extras
+import uuid
+from datetime import datetime
+import orjson
+import psycopg
+from psycopg.rows import dict_row
+from tarot_common.db import run_with_reconnect
+from tarot_common.http import JSON_HEADERS
 
 # 로거 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# 전역 변수로 DB 연결 관리
-db_conn = None
-db_conn_string = None
-ssm_client = None
-DB_CONN_STRING_PARAM_PATH = os.environ.get("DB_CONN_STRING_PARAM_PATH")
+# 목록 응답 헤더: 브라우저에서 X-Next-Cursor 헤더를 읽을 수 있도록 노출합니다.
+PAGE_HEADERS = {**JSON_HEADERS, "Access-Control-Expose-Headers": "X-Next-Cursor"}
 
-def get_db_connection_string():
-    """Parameter Store에서 데이터베이스 연결 문자열을 가져옵니다."""
-    global db_conn_string, ssm_client
-    if db_conn_string:
-        return db_conn_string
-    if not DB_CONN_STRING_PARAM_PATH:
-        raise ValueError("DB_CONN_STRING_PARAM_PATH 환경 변수가 설정되지 않았습니다.")
-    
-    import boto3
-    if ssm_client is None:
-        ssm_client = boto3.client("ssm")
-    
-    logger.info("Parameter Store에서 DB 연결 문자열을 가져옵니다.")
-    parameter = ssm_client.get_parameter(Name=DB_CONN_STRING_PARAM_PATH, WithDecryption=True)
-    db_conn_string = parameter["Parameter"]["Value"]
-    return db_conn_string
+ERR_BAD_CURSOR = {"statusCode": 400, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "Invalid cursor"}).decode()}
+ERR_DB = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "Database error occurred"}).decode()}
+ERR_UNEXPECTED = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "An unexpected error occurred"}).decode()}
 
-def get_db_connection():
-    """데이터베이스 연결을 가져오고, 필요한 경우 새로 생성합니다."""
-    global db_conn
-    if db_conn:
-        try:
-            db_conn.cursor().execute("SELECT 1")
-            return db_conn
-        except psycopg2.OperationalError:
-            db_conn = None
-    
-    conn_string = get_db_connection_string()
-    db_conn = psycopg2.connect(conn_string)
-    db_conn.autocommit = True
-    return db_conn
+def encode_cursor(post):
+    """마지막으로 반환한 게시글의 (created_at, id)로 다음 페이지 커서를 만듭니다."""
+    raw = f"{post['created_at']}|{post['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """
+    커서를 (created_at, id)로 해석합니다.
+    형식이 잘못된 경우 ValueError를 발생시킵니다.
+    """
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    created_at, post_id = raw.split("|")
+    return datetime.fromisoformat(created_at), uuid.UUID(post_id)
 
 def lambda_handler(event, context):
     """
     게시판의 글 목록을 페이지네이션하여 반환합니다.
     최신 글 10개를 기본으로 합니다.
+    'cursor' 파라미터가 있으면 해당 위치 다음의 글을 (created_at, id) 기준 keyset 방식으로 조회하고,
+    다음 페이지 커서는 X-Next-Cursor 헤더로 전달합니다. 'page' 파라미터(OFFSET 방식)도 계속 지원합니다.
     """
-    logger.info(f"Request received: {event}")
+    logger.debug("Request received: %s", event)
     
     try:
-        # 1. 쿼리 스트링에서 'page' 파라미터 추출
+        # 1. 쿼리 스트링에서 'cursor' 또는 'page' 파라미터 추출
         query_params = event.get('queryStringParameters') or {}
+        limit = 10
+
+        cursor_param = query_params.get('cursor')
+        after = None
+        if cursor_param:
+            try:
+                after = decode_cursor(cursor_param)
+            except ValueError:
+                return ERR_BAD_CURSOR
+
         try:
             page = int(query_params.get('page', '1'))
             if page < 1: page = 1
         except ValueError:
             page = 1
         
-        limit = 10
         offset = (page - 1) * limit
 
         # 2. 데이터베이스에서 게시글 목록 조회
-        conn = get_db_connection()
-        # RealDictCursor: 결과를 dictionary 형태로 받기 위함
-        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
-            # users 테이블과 JOIN하여 작성자 닉네임과 프로필 이미지 URL도 함께 가져옴
-            # is_deleted가 false인 게시글만 최신순으로 정렬
-            fetch_query = """
-                SELECT
-                    p.id,
-                    p.title,
-                    p.created_at,
-                    p.user_id,
-                    u.nickname,
-                    u.profile_image_url
-                FROM public.posts p
-                JOIN public.users u ON p.user_id = u.id
-                WHERE p.is_deleted = FALSE
-                ORDER BY p.created_at DESC
-                LIMIT %s OFFSET %s;
-            """
-            cursor.execute(fetch_query, (limit, offset))
-            posts = cursor.fetchall()
+        def fetch_posts(conn):
+            # dict_row: 결과를 dictionary 형태로 받기 위함
+            with conn.cursor(row_factory=dict_row) as cursor:
+                # users 테이블과 JOIN하여 작성자 닉네임과 프로필 이미지 URL도 함께 가져옴
+                # is_deleted가 false인 게시글만 최신순으로 정렬 (같은 시각이면 id 역순)
+                # id와 created_at은 DB에서 바로 JSON에 쓸 문자열(ISO 8601)로 변환
+                select_clause = """
+                    SELECT
+                        p.id::text AS id,
+                        p.title,
+                        to_char(p.created_at, 'YYYY-MM-DD"T"HH24:MI:SS.USTZH:TZM') AS created_at,
+                        p.user_id::text AS user_id,
+                        u.nickname,
+                        u.profile_image_url
+                    FROM public.posts p
+                    JOIN public.users u ON p.user_id = u.id
+                """
+                if after:
+                    # keyset: (created_at, id) 인덱스를 따라 커서 위치부터 바로 읽으므로 페이지 깊이와 무관
+                    fetch_query = select_clause + """
+                        WHERE p.is_deleted = FALSE AND (p.created_at, p.id) < (%s, %s)
+                        ORDER BY p.created_at DESC, p.id DESC
+                        LIMIT %s;
+                    """
+                    params = (after[0], after[1], limit)
+                else:
+                    fetch_query = select_clause + """
+                        WHERE p.is_deleted = FALSE
+                        ORDER BY p.created_at DESC, p.id DESC
+                        LIMIT %s OFFSET %s;
+                    """
+                    params = (limit, offset)
+                cursor.execute(fetch_query, params)
+                return cursor.fetchall()
 
-            # id(uuid)와 created_at(datetime)을 문자열로 변환
-            for post in posts:
-                post['id'] = str(post['id'])
-                post['user_id'] = str(post['user_id'])
-                post['created_at'] = post['created_at'].isoformat()
-        
-        logger.info(f"{len(posts)}개의 게시글을 조회했습니다 (페이지: {page}).")
+        posts = run_with_reconnect(fetch_posts)
+
+        if after:
+            logger.info("%s개의 게시글을 조회했습니다 (커서: %s).", len(posts), cursor_param)
+        else:
+            logger.info("%s개의 게시글을 조회했습니다 (페이지: %s).", len(posts), page)
+
+        # 3. 성공 응답 반환 (다음 페이지가 있을 수 있으면 커서를 헤더로 전달)
+        headers = PAGE_HEADERS
+        if len(posts) == limit:
+            headers = {**PAGE_HEADERS, "X-Next-Cursor": encode_cursor(posts[-1])}
 
-        # 3. 성공 응답 반환
         return {
             "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-            },
-            "body": json.dumps(posts),
+            "headers": headers,
+            "body": orjson.dumps(posts).decode(),
         }
 
-    except psycopg2.Error as e:
-        logger.error(f"데이터베이스 오류 발생: {e}", exc_info=True)
-        return {"statusCode": 500, "body": json.dumps({"error": "Database error occurred"})}
+    except psycopg.Error as e:
+        logger.error("데이터베이스 오류 발생: %s", e, exc_info=True)
+        return ERR_DB
     except Exception as e:
-        logger.error(f"처리 중 예외 발생: {e}", exc_info=True)
-        return {"statusCode": 500, "body": json.dumps({"error": "An unexpected error occurred"})}
+        logger.error("처리 중 예외 발생: %s", e, exc_info=True)
+        return ERR_UNEXPECTED
@@ -1,82 +1,49 @@
-import json
 import logging
-import os
-import psycopg2
-from psycopg2 import extras
+import orjson
+from tarot_common.db import run_with_reconnect
+from tarot_common.http import JSON_HEADERS
 
-# CreateShareFunction과 동일한 DB 연결 로직
-# ---------------------------------------------------
+# 로거 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-db_conn = None
-db_conn_string = None
-ssm_client = None
-DB_CONN_STRING_PARAM_PATH = os.environ.get("DB_CONN_STRING_PARAM_PATH")
-
-def get_db_connection_string():
-    global db_conn_string, ssm_client
-    if db_conn_string: return db_conn_string
-    if not DB_CONN_STRING_PARAM_PATH: raise ValueError("DB_CONN_STRING_PARAM_PATH 환경 변수가 설정되지 않았습니다.")
-
-    import boto3
-    if ssm_client is None: ssm_client = boto3.client("ssm")
-    
-    logger.info("Parameter Store에서 DB 연결 문자열을 가져옵니다.")
-    parameter = ssm_client.get_parameter(Name=DB_CONN_STRING_PARAM_PATH, WithDecryption=True)
-    db_conn_string = parameter["Parameter"]["Value"]
-    return db_conn_string
-
-def get_db_connection():
-    global db_conn
-    if db_conn:
-        try:
-            db_conn.cursor().execute("SELECT 1")
-            return db_conn
-        except psycopg2.OperationalError:
-            db_conn = None
-    
-    conn_string = get_db_connection_string()
-    db_conn = psycopg2.connect(conn_string)
-    db_conn.autocommit = True
-    return db_conn
-# ---------------------------------------------------
+ERR_NO_SHARE_ID = {"statusCode": 400, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "share_id is required"}).decode()}
+ERR_READING_NOT_FOUND = {"statusCode": 404, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "Reading not found"}).decode()}
+ERR_UNEXPECTED = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "An unexpected error occurred"}).decode()}
 
 def lambda_handler(event, context):
     """
     share_id로 공유된 타로 리딩 결과를 조회합니다. (인증 불필요)
     """
-    logger.info(f"Request received: {event}")
+    logger.debug("Request received: %s", event)
 
     try:
         # 1. 경로 파라미터에서 share_id 추출
         share_id = event.get('pathParameters', {}).get('share_id')
         if not share_id:
-            return {"statusCode": 400, "body": json.dumps({"error": "share_id is required"})}
+            return ERR_NO_SHARE_ID
 
         # 2. 데이터베이스에서 결과 조회
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=extras.DictCursor)
+        def fetch_reading(conn):
+            with conn.cursor() as cursor:
+                # jsonb를 텍스트로 받아 파싱/재직렬화 없이 그대로 응답 본문으로 사용합니다.
+                # reading_data가 NULL인 행은 본문으로 쓸 수 없으므로 찾지 못한 것으로 처리합니다.
+                query = "SELECT reading_data::text FROM public.shared_readings WHERE id = %s AND reading_data IS NOT NULL;"
+                cursor.execute(query, (share_id,))
+                return cursor.fetchone()
 
-        query = "SELECT reading_data FROM public.shared_readings WHERE id = %s;"
-        cursor.execute(query, (share_id,))
-        
-        result = cursor.fetchone()
-        cursor.close()
+        result = run_with_reconnect(fetch_reading)
 
         # 3. 결과 반환
-        if result and 'reading_data' in result:
+        if result:
             return {
                 "statusCode": 200,
-                "headers": {
-                    "Content-Type": "application/json",
-                    "Access-Control-Allow-Origin": "*",
-                },
-                "body": json.dumps(result['reading_data']),
+                "headers": JSON_HEADERS,
+                "body": result[0],
             }
         else:
-            return {"statusCode": 404, "body": json.dumps({"error": "Reading not found"})}
+            return ERR_READING_NOT_FOUND
 
     except Exception as e:
-        logger.error(f"처리 중 예외 발생: {e}", exc_info=True)
-        return {"statusCode": 500, "body": json.dumps({"error": "An unexpected error occurred"})}
+        logger.error("처리 중 예외 발생: %s", e, exc_info=True)
+        return ERR_UNEXPECTED
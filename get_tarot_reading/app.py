@@ -1,154 +1,101 @@
-import json
 import logging
 import os
 import random
-import boto3
+import time
 import google.generativeai as genai
-import psycopg2
-from psycopg2 import extras
+import orjson
+import psycopg
+from tarot_common.aws import get_ssm_parameter
+from tarot_common.db import run_with_reconnect
+from tarot_common.http import JSON_HEADERS, load_json_body
+
+# SnapStart 런타임 훅 (SnapStart를 사용하지 않는 환경에서는 없을 수 있습니다)
+try:
+    from snapshot_restore_py import register_after_restore
+except ImportError:
+    register_after_restore = None
 
 # 로거 설정
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# --- 전역 변수 ---
-ssm_client = None
-gemini_api_key = None
-db_conn = None
-db_conn_string = None
+ERR_NO_CONCERN = {"statusCode": 400, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "고민 내용(concern)이 필요합니다."}).decode()}
+ERR_NO_USER = {"statusCode": 401, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "User ID not found in token"}).decode()}
+ERR_NO_CREDIT = {
+    "statusCode": 402, # Payment Required
+    "headers": JSON_HEADERS,
+    "body": orjson.dumps({"error": "크레딧이 부족합니다. 크레딧을 충전해주세요."}).decode(),
+}
+ERR_GEMINI = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "AI 모델 응답 처리 실패"}).decode()}
+ERR_DB = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "데이터베이스 오류가 발생했습니다."}).decode()}
+ERR_UNEXPECTED = {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": "서버에서 예상치 못한 오류가 발생했습니다."}).decode()}
 
 # --- 환경 변수 ---
 GEMINI_API_KEY_PARAM_PATH = os.environ.get("GEMINI_API_KEY_PARAM_PATH")
-DB_CONN_STRING_PARAM_PATH = os.environ.get("DB_CONN_STRING_PARAM_PATH") # template.yaml에 추가 필요
+GEMINI_MODEL_NAME = "gemini-2.5-flash-lite"
+# JSON 모드로 응답을 받아 마크다운 구분자 제거 없이 바로 파싱합니다.
+GEMINI_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+# Gemini 호출 제한 시간은 요청마다 남은 시간으로 계산합니다.
+# Lambda 남은 시간과 API Gateway 통합 타임아웃(29초) 중 먼저 오는 쪽보다 여유 시간만큼 일찍 끊어야
+# 실패 시 크레딧 환불과 오류 응답이 클라이언트에 전달됩니다.
+API_GATEWAY_TIMEOUT_SECONDS = 29
+GEMINI_TIMEOUT_MARGIN_SECONDS = 3
+GEMINI_MIN_TIMEOUT_SECONDS = 3
+# 워밍업 호출이 init 단계(10초 제한)나 복원 훅을 붙잡지 않도록 짧게 끊습니다.
+GEMINI_WARMUP_REQUEST_OPTIONS = {"timeout": 3}
 
 # --- 데이터 로드 ---
-TAROT_CARDS_DATA = []
+# 카드 데이터는 모듈 로드 시 필드별 튜플로 변환하여 요청마다 인덱스 조회만 하도록 합니다.
+CARD_IMAGE_URL_TMPL = "https://d2yzln6f92x3hm.cloudfront.net/public/cards/{}.png"
+NAMES = UPRIGHTS = REVERSEDS = IMAGE_URLS = ()
 try:
-    with open("cards.json", "r", encoding="utf-8") as f:
-        TAROT_CARDS_DATA = json.load(f)["cards"]
+    with open("cards.json", "rb") as f:
+        cards = orjson.loads(f.read())["cards"]
+    NAMES = tuple(card["name"] for card in cards)
+    UPRIGHTS = tuple(card["upright"] for card in cards)
+    REVERSEDS = tuple(card["reversed"] for card in cards)
+    IMAGE_URLS = tuple(CARD_IMAGE_URL_TMPL.format(card["index"]) for card in cards)
+    del cards
 except Exception as e:
-    logger.error(f"cards.json 파일 로드 실패: {e}")
-
-# --- Helper Functions for AWS/DB ---
+    logger.error("cards.json 파일 로드 실패: %s", e)
+N_CARDS = len(NAMES)
 
-def get_gemini_api_key():
-    global gemini_api_key, ssm_client
-    if gemini_api_key:
-        return gemini_api_key
-    
-    if not GEMINI_API_KEY_PARAM_PATH:
-        raise ValueError("GEMINI_API_KEY_PARAM_PATH 환경 변수가 설정되지 않았습니다.")
-        
-    if ssm_client is None:
-        ssm_client = boto3.client("ssm")
-        
-    try:
-        parameter = ssm_client.get_parameter(Name=GEMINI_API_KEY_PARAM_PATH, WithDecryption=True)
-        gemini_api_key = parameter["Parameter"]["Value"]
-        return gemini_api_key
-    except Exception as e:
-        logger.error(f"SSM Parameter Store에서 Gemini API Key 로드 실패: {e}")
-        raise
+# --- 카드 뽑기 ---
 
-def get_db_connection_string():
-    global db_conn_string, ssm_client
-    if db_conn_string:
-        return db_conn_string
+def draw_cards():
+    """
+    서로 다른 카드 3장과 각 카드의 방향(정/역)을 난수 한 번으로 뽑습니다.
+    64비트 난수를 N, N-1, N-2 진법으로 나누어 인덱스를 얻고, 몫의 하위 3비트를 방향으로 사용합니다.
+    (N * (N-1) * (N-2)가 2^64보다 훨씬 작으므로 나머지 연산에 의한 편향은 무시할 수 있습니다.)
+    [(인덱스, 정방향 여부), ...]를 반환합니다.
+    """
+    r = random.getrandbits(64)
+    r, i0 = divmod(r, N_CARDS)
+    r, i1 = divmod(r, N_CARDS - 1)
+    r, i2 = divmod(r, N_CARDS - 2)
 
-    if not DB_CONN_STRING_PARAM_PATH:
-        raise ValueError("DB_CONN_STRING_PARAM_PATH 환경 변수가 설정되지 않았습니다.")
+    # 이미 뽑힌 인덱스를 건너뛰도록 보정합니다. (부분 Fisher-Yates 셔플과 같은 분포)
+    if i1 >= i0:
+        i1 += 1
+    low, high = (i0, i1) if i0 < i1 else (i1, i0)
+    if i2 >= low:
+        i2 += 1
+    if i2 >= high:
+        i2 += 1
 
-    if ssm_client is None:
-        ssm_client = boto3.client("ssm")
-        
-    try:
-        parameter = ssm_client.get_parameter(Name=DB_CONN_STRING_PARAM_PATH, WithDecryption=True)
-        db_conn_string = parameter["Parameter"]["Value"]
-        return db_conn_string
-    except Exception as e:
-        logger.error(f"SSM Parameter Store에서 DB 연결 문자열 로드 실패: {e}")
-        raise
+    return [(i0, bool(r & 1)), (i1, bool(r & 2)), (i2, bool(r & 4))]
 
-def get_db_connection():
-    global db_conn
-    try:
-        if db_conn and db_conn.closed == 0:
-            db_conn.cursor().execute("SELECT 1")
-            return db_conn
-    except psycopg2.OperationalError:
-        logger.warning("기존 DB 연결이 유효하지 않아 재연결합니다.")
-        db_conn = None
-
-    conn_string = get_db_connection_string()
-    try:
-        db_conn = psycopg2.connect(conn_string)
-        db_conn.autocommit = True
-        return db_conn
-    except Exception as e:
-        logger.error(f"DB 연결 실패: {e}")
-        raise
-
-# --- Main Lambda Handler ---
-
-def lambda_handler(event, context):
-    logger.info(f"Request received: {event}")
-    
-    conn = None
-    try:
-        # 1. 사용자 정보 및 요청 본문 파싱
-        authorizer_context = event.get('requestContext', {}).get('authorizer', {})
-        user_id = authorizer_context.get('user_id')
-        if not user_id:
-            return {"statusCode": 401, "body": json.dumps({"error": "User ID not found in token"}, ensure_ascii=False)}
-
-        body = json.loads(event.get("body", "{}"))
-        user_concern = body.get("concern")
-        if not user_concern:
-            return {"statusCode": 400, "body": json.dumps({"error": "고민 내용(concern)이 필요합니다."}, ensure_ascii=False)}
-
-        # 2. 크레딧 확인
-        conn = get_db_connection()
-        with conn.cursor(cursor_factory=extras.DictCursor) as cursor:
-            cursor.execute("SELECT credit FROM public.users WHERE id = %s", (user_id,))
-            user = cursor.fetchone()
-            if user is None or user['credit'] < 1:
-                return {
-                    "statusCode": 402, # Payment Required
-                    "headers": {"Content-Type": "application/json"},
-                    "body": json.dumps({"error": "크레딧이 부족합니다. 크레딧을 충전해주세요."}, ensure_ascii=False)
-                }
-
-        # 3. 타로카드 선택 (기존 로직 유지)
-        if not TAROT_CARDS_DATA:
-            raise ValueError("타로카드 데이터를 로드하지 못했습니다.")
-            
-        selected_indices = random.sample(range(len(TAROT_CARDS_DATA)), 3)
-        selected_cards_info = []
-        for index in selected_indices:
-            card = TAROT_CARDS_DATA[index]
-            orientation = random.choice(["정방향", "역방향"])
-            meaning_key = "upright" if orientation == "정방향" else "reversed"
-            selected_cards_info.append({
-                "name": card["name"],
-                "orientation": orientation,
-                "meaning": card[meaning_key],
-                "image_url": f"https://d2yzln6f92x3hm.cloudfront.net/public/cards/{card['index']}.png"
-            })
-
-        # 4. Gemini API 호출
-        api_key = get_gemini_api_key()
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel(model_name="gemini-2.5-flash-lite")
-
-        prompt = f"""
+# --- 프롬프트 템플릿 ---
+# 요청마다 큰 f-string을 새로 파싱하지 않도록 모듈 로드 시 한 번만 정의하고 str.format으로 채웁니다.
+PROMPT_TMPL = """
         You are 'Tarot-Jeong', a highly intuitive and sincere Tarot Reader. Your goal is to provide a direct, honest, and truly helpful reading, avoiding generic advice or vague moralizing.
 
         ### CONTEXT
-        - User's Question/Concern: {user_concern}
+        - User's Question/Concern: {concern}
         - Drawn Cards:
-            1. Past: {selected_cards_info[0]['name']} ({selected_cards_info[0]['orientation']}) - {selected_cards_info[0]['meaning']}
-            2. Present: {selected_cards_info[1]['name']} ({selected_cards_info[1]['orientation']}) - {selected_cards_info[1]['meaning']}
-            3. Future: {selected_cards_info[2]['name']} ({selected_cards_info[2]['orientation']}) - {selected_cards_info[2]['meaning']}
+            1. Past: {past_name} ({past_orientation}) - {past_meaning}
+            2. Present: {present_name} ({present_orientation}) - {present_meaning}
+            3. Future: {future_name} ({future_orientation}) - {future_meaning}
 
         ### CRITICAL INSTRUCTIONS
         1. **Be Direct & Predictive**: If the user asks a specific question (e.g., "Will I succeed?", "Does he like me?"), you MUST provide a clear inclination (Yes/No/Likely/Unlikely) based on the cards. Do NOT say "it depends on you" or "the future is not set". Interpret the cards' tendency boldly.
@@ -176,45 +123,171 @@ def lambda_handler(event, context):
         }}
         """
 
-        try:
-            gemini_response = model.generate_content(prompt)
-            json_text = gemini_response.text.strip().replace("```json", "").replace("```", "")
-            reading_data = json.loads(json_text)
-        except Exception as e:
-            logger.error(f"Gemini API 호출 또는 JSON 파싱 오류: {e}")
-            return {"statusCode": 500, "body": json.dumps({"error": "AI 모델 응답 처리 실패"}, ensure_ascii=False)}
+# --- Gemini 모델 ---
 
-        # 5. 크레딧 차감 (Gemini 호출 성공 후)
-        try:
+# Gemini 설정과 모델 객체는 모듈 로드 시 한 번만 만들어 호출 간에 재사용합니다.
+# genai.configure는 전역 클라이언트를 새로 만들기 때문에 핸들러에서 다시 호출하지 않아야
+# 웜 호출 사이에 gRPC 채널과 TLS 세션이 유지됩니다.
+gemini_model = None
+
+def get_gemini_model():
+    """Gemini 모델을 가져오고, 필요한 경우 API 키를 불러와 새로 생성합니다."""
+    global gemini_model
+    if gemini_model is None:
+        genai.configure(api_key=get_ssm_parameter(GEMINI_API_KEY_PARAM_PATH))
+        gemini_model = genai.GenerativeModel(
+            model_name=GEMINI_MODEL_NAME,
+            generation_config=GEMINI_GENERATION_CONFIG,
+        )
+    return gemini_model
+
+def warm_up_gemini_model():
+    """
+    미리 API 키를 불러와 모델을 준비합니다.
+    count_tokens는 과금되지 않는 가벼운 호출로, gRPC 채널 생성과 TLS 핸드셰이크를 첫 요청 전에 끝내 둡니다.
+    """
+    try:
+        get_gemini_model().count_tokens("ping", request_options=GEMINI_WARMUP_REQUEST_OPTIONS)
+    except Exception as e:
+        logger.warning("초기화 단계의 Gemini 설정에 실패했습니다. 첫 요청 시 재시도합니다: %s", e)
+
+def restore_after_snapshot():
+    """
+    SnapStart 스냅샷에서 복원된 뒤 실행 환경마다 달라야 하는 상태를 다시 만듭니다.
+    스냅샷의 난수 상태를 그대로 쓰면 복원된 모든 환경이 같은 카드를 뽑으므로 시드를 새로 설정하고,
+    스냅샷 시점의 gRPC 연결은 끊어져 있으므로 Gemini 클라이언트를 다시 만듭니다.
+    """
+    global gemini_model
+    random.seed()
+    gemini_model = None
+    warm_up_gemini_model()
+
+# 콜드 스타트 시 init 단계에서 미리 모델을 준비합니다.
+warm_up_gemini_model()
+
+if register_after_restore is not None:
+    register_after_restore(restore_after_snapshot)
+
+# --- Helper Functions for DB ---
+
+def refund_credit(user_id):
+    """
+    결과를 돌려주지 못한 요청에 대해 미리 차감한 크레딧 1을 되돌립니다.
+    환불에 실패하면 로깅만 하고 원래 오류 응답을 그대로 반환합니다.
+    """
+    def increment_credit(conn):
+        with conn.cursor() as cursor:
+            cursor.execute("UPDATE public.users SET credit = credit + 1 WHERE id = %s", (user_id,))
+
+    try:
+        run_with_reconnect(increment_credit)
+        logger.info("사용자(id: %s)의 크레딧 1을 환불했습니다.", user_id)
+    except Exception as e:
+        logger.error("사용자(id: %s) 크레딧 환불 실패: %s", user_id, e)
+
+def get_gemini_timeout(context, started_at):
+    """Lambda와 API Gateway의 남은 시간 중 짧은 쪽에서 여유 시간을 뺀 Gemini 호출 제한 시간(초)을 반환합니다."""
+    remaining = min(
+        context.get_remaining_time_in_millis() / 1000,
+        API_GATEWAY_TIMEOUT_SECONDS - (time.monotonic() - started_at),
+    )
+    return remaining - GEMINI_TIMEOUT_MARGIN_SECONDS
+
+# --- Main Lambda Handler ---
+
+def lambda_handler(event, context):
+    started_at = time.monotonic()
+    logger.debug("Request received: %s", event)
+    
+    try:
+        # 1. 사용자 정보 및 요청 본문 파싱
+        authorizer_context = event.get('requestContext', {}).get('authorizer', {})
+        user_id = authorizer_context.get('user_id')
+        if not user_id:
+            return ERR_NO_USER
+
+        body = load_json_body(event)
+        user_concern = body.get("concern")
+        if not user_concern:
+            return ERR_NO_CONCERN
+
+        if not N_CARDS:
+            raise ValueError("타로카드 데이터를 로드하지 못했습니다.")
+
+        # 2. 크레딧 확인 및 차감 (Gemini 호출 전)
+        # 확인과 차감을 한 문장으로 처리하여 동시 요청이 같은 크레딧을 두 번 사용하지 못하게 합니다.
+        # 차감을 Gemini 호출과 병렬로 실행하지 않습니다. 크레딧이 없는 요청도 Gemini를 호출하게 되어
+        # 절약되는 DB 왕복 한 번(수 ms)보다 낭비되는 Gemini 호출 비용이 훨씬 큽니다.
+        def deduct_credit(conn):
             with conn.cursor() as cursor:
-                cursor.execute("UPDATE public.users SET credit = credit - 1 WHERE id = %s", (user_id,))
-            logger.info(f"사용자(id: {user_id})의 크레딧을 1 차감했습니다.")
+                cursor.execute(
+                    "UPDATE public.users SET credit = credit - 1 WHERE id = %s AND credit >= 1 RETURNING credit",
+                    (user_id,),
+                )
+                return cursor.fetchone()
+
+        if run_with_reconnect(deduct_credit) is None:
+            return ERR_NO_CREDIT
+        logger.info("사용자(id: %s)의 크레딧을 1 차감했습니다.", user_id)
+
+        # 3. 타로카드 선택 (난수 한 번으로 서로 다른 카드 3장과 방향을 뽑음)
+        selected_cards_info = []
+        for index, is_upright in draw_cards():
+            selected_cards_info.append({
+                "name": NAMES[index],
+                "orientation": "정방향" if is_upright else "역방향",
+                "meaning": (UPRIGHTS if is_upright else REVERSEDS)[index],
+                "image_url": IMAGE_URLS[index],
+            })
+
+        # 4. Gemini API 호출
+        past, present, future = selected_cards_info
+        prompt = PROMPT_TMPL.format(
+            concern=user_concern,
+            past_name=past["name"], past_orientation=past["orientation"], past_meaning=past["meaning"],
+            present_name=present["name"], present_orientation=present["orientation"], present_meaning=present["meaning"],
+            future_name=future["name"], future_orientation=future["orientation"], future_meaning=future["meaning"],
+        )
+
+        # DB 대기 등으로 시간이 거의 남지 않았다면 Gemini를 호출하지 않고 바로 환불합니다.
+        gemini_timeout = get_gemini_timeout(context, started_at)
+        if gemini_timeout < GEMINI_MIN_TIMEOUT_SECONDS:
+            logger.error("Gemini 호출에 남은 시간이 부족합니다: %.1f초", gemini_timeout)
+            refund_credit(user_id)
+            return ERR_GEMINI
+
+        try:
+            # 스트리밍으로 받은 조각을 바로 버퍼에 이어 붙이고, 마지막 조각이 도착하면 한 번만 파싱합니다.
+            gemini_response = get_gemini_model().generate_content(
+                prompt,
+                stream=True,
+                request_options={"timeout": gemini_timeout},
+            )
+            buffer = bytearray()
+            for chunk in gemini_response:
+                buffer += chunk.text.encode()
+            reading_data = orjson.loads(buffer)
         except Exception as e:
-            # 크레딧 차감에 실패하더라도 사용자는 이미 결과를 받았으므로 로깅만 하고 넘어갑니다.
-            logger.error(f"사용자(id: {user_id}) 크레딧 차감 실패: {e}")
+            logger.error("Gemini API 호출 또는 JSON 파싱 오류: %s", e)
+            refund_credit(user_id)
+            return ERR_GEMINI
 
-        # 6. 최종 결과 반환
+        # 5. 최종 결과 반환
         return {
             "statusCode": 200,
-            "headers": {
-                "Content-Type": "application/json",
-                "Access-Control-Allow-Origin": "*",
-            },
-            "body": json.dumps({
+            "headers": JSON_HEADERS,
+            "body": orjson.dumps({
                 "cards": selected_cards_info,
                 "reading": reading_data
-            }, ensure_ascii=False),
+            }).decode(),
         }
 
-    except psycopg2.Error as e:
-        logger.error(f"데이터베이스 오류: {e}")
-        return {"statusCode": 500, "body": json.dumps({"error": "데이터베이스 오류가 발생했습니다."}, ensure_ascii=False)}
+    except psycopg.Error as e:
+        logger.error("데이터베이스 오류: %s", e)
+        return ERR_DB
     except ValueError as e:
-        logger.error(f"설정 오류: {e}")
-        return {"statusCode": 500, "body": json.dumps({"error": str(e)}, ensure_ascii=False)}
+        logger.error("설정 오류: %s", e)
+        return {"statusCode": 500, "headers": JSON_HEADERS, "body": orjson.dumps({"error": str(e)}).decode()}
     except Exception as e:
-        logger.error(f"예상치 못한 오류: {e}")
-        return {"statusCode": 500, "body": json.dumps({"error": "서버에서 예상치 못한 오류가 발생했습니다."}, ensure_ascii=False)}
-    finally:
-        # Lambda 실행 컨텍스트가 유지되는 동안 연결을 재사용하므로, 여기서 닫지 않습니다.
-        pass
+        logger.error("예상치 못한 오류: %s", e)
+        return ERR_UNEXPECTED
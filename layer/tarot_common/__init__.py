@@ -0,0 +1,7 @@
+"""
+타로정 Lambda 함수들이 공유하는 헬퍼 모듈입니다. (TarotCommonLayer)
+
+- aws: 모듈 로드 시 생성되는 AWS 클라이언트와 Parameter Store 조회 캐시
+- db: 함수별 커넥션 풀과 재연결 헬퍼
+- http: API Gateway 응답 공통 헤더
+"""
@@ -0,0 +1,92 @@
+import logging
+import os
+import random
+import time
+import boto3
+
+logger = logging.getLogger(__name__)
+
+# AWS 클라이언트는 모듈 로드 시 한 번만 생성하여 호출 간에 HTTPS 세션을 재사용합니다.
+try:
+    ssm_client = boto3.client("ssm")
+except Exception as e:
+    logger.error("SSM 클라이언트 생성 실패: %s", e)
+    ssm_client = None
+
+# Parameter Store 조회 결과 캐시: path -> (값, 만료 시각)
+# 컨테이너마다 만료 시각이 흩어지도록 TTL에 지터를 더하고, 조회 실패 시에는 잠시 재조회를 멈춥니다.
+SSM_CACHE_TTL = 300
+SSM_CACHE_JITTER = 30
+SSM_FAILURE_BACKOFF = 5
+ssm_cache = {}
+ssm_failures = {}
+
+# GetParameters 한 번에 조회할 수 있는 최대 파라미터 수
+SSM_GET_PARAMETERS_MAX = 10
+
+def get_ssm_parameter(param_path):
+    """
+    Parameter Store에서 파라미터 값을 가져옵니다.
+    값은 TTL 동안 캐싱하며, 조회에 실패하면 만료된 캐시 값이 있을 경우 그 값을 대신 사용합니다.
+    """
+    if not param_path:
+        raise ValueError("Parameter Store 경로 환경 변수가 설정되지 않았습니다.")
+
+    now = time.time()
+    cached = ssm_cache.get(param_path)
+    if cached and cached[1] > now:
+        return cached[0]
+    if ssm_failures.get(param_path, 0) > now:
+        if cached:
+            return cached[0]
+        raise RuntimeError(f"Parameter Store의 '{param_path}' 조회가 최근 실패하여 재시도를 잠시 보류합니다.")
+
+    try:
+        logger.info("Parameter Store에서 '%s' 값을 가져옵니다.", param_path)
+        parameter = ssm_client.get_parameter(Name=param_path, WithDecryption=True)
+    except Exception as e:
+        ssm_failures[param_path] = now + SSM_FAILURE_BACKOFF
+        if cached:
+            logger.warning("Parameter Store 조회 실패로 만료된 캐시 값을 사용합니다: %s", e)
+            return cached[0]
+        raise
+
+    value = parameter["Parameter"]["Value"]
+    ssm_cache[param_path] = (value, now + SSM_CACHE_TTL + random.uniform(0, SSM_CACHE_JITTER))
+    ssm_failures.pop(param_path, None)
+    return value
+
+def get_ssm_parameters(param_paths):
+    """
+    여러 파라미터를 한 번의 GetParameters 호출로 가져와 캐시에 채웁니다.
+    캐시에 유효한 값이 있는 파라미터는 다시 조회하지 않으며, {path: 값} 딕셔너리를 반환합니다.
+    """
+    now = time.time()
+    values = {}
+    missing = []
+    for param_path in dict.fromkeys(param_paths):
+        cached = ssm_cache.get(param_path)
+        if cached and cached[1] > now:
+            values[param_path] = cached[0]
+        else:
+            missing.append(param_path)
+
+    for i in range(0, len(missing), SSM_GET_PARAMETERS_MAX):
+        names = missing[i:i + SSM_GET_PARAMETERS_MAX]
+        logger.info("Parameter Store에서 %s 값을 한 번에 가져옵니다.", names)
+        response = ssm_client.get_parameters(Names=names, WithDecryption=True)
+        for parameter in response["Parameters"]:
+            value = parameter["Value"]
+            ssm_cache[parameter["Name"]] = (value, now + SSM_CACHE_TTL + random.uniform(0, SSM_CACHE_JITTER))
+            ssm_failures.pop(parameter["Name"], None)
+            values[parameter["Name"]] = value
+        if response.get("InvalidParameters"):
+            logger.warning("Parameter Store에 존재하지 않는 파라미터입니다: %s", response["InvalidParameters"])
+    return values
+
+# 콜드 스타트 시 함수에 설정된 모든 '*_PARAM_PATH' 파라미터를 한 번에 불러와 캐시를 채웁니다.
+# 이후 get_ssm_parameter 호출은 네트워크 왕복 없이 캐시에서 값을 반환합니다.
+try:
+    get_ssm_parameters([value for key, value in os.environ.items() if key.endswith("_PARAM_PATH") and value])
+except Exception as e:
+    logger.warning("초기화 단계의 Parameter Store 일괄 조회에 실패했습니다. 개별 조회로 재시도합니다: %s", e)
@@ -0,0 +1,107 @@
+import atexit
+import logging
+import os
+import signal
+import sys
+import orjson
+import psycopg
+from psycopg.types.json import set_json_dumps, set_json_loads
+from psycopg_pool import ConnectionPool, PoolTimeout
+from tarot_common.aws import get_ssm_parameter
+
+# SnapStart 런타임 훅 (SnapStart를 사용하지 않는 환경에서는 없을 수 있습니다)
+try:
+    from snapshot_restore_py import register_after_restore, register_before_snapshot
+except ImportError:
+    register_after_restore = register_before_snapshot = None
+
+logger = logging.getLogger(__name__)
+
+DB_CONN_STRING_PARAM_PATH = os.environ.get("DB_CONN_STRING_PARAM_PATH")
+
+# 서버 측 prepared statement 사용 기준(같은 쿼리를 몇 번 실행하면 prepare할지).
+# Supabase 트랜잭션 모드 풀러(포트 6543)는 prepared statement를 지원하지 않으므로 기본값은 비활성화(None)이며,
+# 세션 모드(포트 5432)나 직접 연결을 사용할 때만 DB_PREPARE_THRESHOLD에 정수(예: 0)를 설정합니다.
+_prepare_threshold = os.environ.get("DB_PREPARE_THRESHOLD", "").strip()
+DB_PREPARE_THRESHOLD = int(_prepare_threshold) if _prepare_threshold.isdigit() else None
+
+# json/jsonb 컬럼의 파싱과 직렬화에도 orjson을 사용합니다.
+set_json_loads(orjson.loads)
+set_json_dumps(orjson.dumps)
+
+# 전역 변수로 DB 연결 관리
+db_pool = None
+
+def get_db_connection_string():
+    """Parameter Store에서 데이터베이스 연결 문자열을 가져옵니다."""
+    if not DB_CONN_STRING_PARAM_PATH:
+        raise ValueError("DB_CONN_STRING_PARAM_PATH 환경 변수가 설정되지 않았습니다.")
+    return get_ssm_parameter(DB_CONN_STRING_PARAM_PATH)
+
+def get_db_pool():
+    """데이터베이스 커넥션 풀을 가져오고, 필요한 경우 새로 생성합니다."""
+    global db_pool
+    if db_pool is None or db_pool.closed:
+        db_pool = ConnectionPool(
+            conninfo=get_db_connection_string(),
+            min_size=1,
+            max_size=4,
+            # 함수 타임아웃(10초)보다 충분히 짧게 기다려야 핸들러가 500 응답을 직접 돌려줄 수 있습니다.
+            timeout=3,
+            kwargs={"autocommit": True, "prepare_threshold": DB_PREPARE_THRESHOLD},
+            open=True,
+        )
+    return db_pool
+
+def run_with_reconnect(operation):
+    """
+    풀에서 연결을 빌려 DB 작업을 실행합니다. 연결이 끊어진 경우 한 번 다시 시도합니다.
+    끊어진 연결은 풀에 반환될 때 폐기되고 새 연결로 교체됩니다.
+    매 호출마다 'SELECT 1'로 연결을 확인하지 않고, 실제 쿼리에서 발생한 연결 오류로 재연결을 판단합니다.
+    풀이 가득 차서 연결을 빌리지 못한 경우(PoolTimeout)는 다시 기다리지 않고 그대로 전달합니다.
+    """
+    try:
+        with get_db_pool().connection() as conn:
+            return operation(conn)
+    except PoolTimeout:
+        raise
+    except (psycopg.OperationalError, psycopg.InterfaceError):
+        logger.warning("DB 연결이 끊어져 새 연결로 다시 시도합니다.")
+        with get_db_pool().connection() as conn:
+            return operation(conn)
+
+def close_db_pool(signum, frame):
+    """컨테이너 종료(SIGTERM) 시 커넥션 풀을 정리합니다."""
+    if db_pool is not None:
+        db_pool.close()
+    sys.exit(0)
+
+signal.signal(signal.SIGTERM, close_db_pool)
+
+def shutdown_db_pool():
+    """
+    커넥션 풀을 닫습니다. 인터프리터 종료 시, 그리고 SnapStart 스냅샷 직전에
+    열린 소켓과 풀 작업 스레드가 스냅샷에 남지 않도록 호출됩니다. 닫힌 풀은 get_db_pool()이 다시 만듭니다.
+    """
+    if db_pool is not None:
+        db_pool.close()
+
+atexit.register(shutdown_db_pool)
+
+def warm_up_db_pool():
+    """
+    첫 요청의 지연을 줄이기 위해 미리 DB에 연결합니다.
+    제한 시간 안에 연결하지 못하면 wait()가 풀을 닫으므로, 다음 요청에서 get_db_pool()이 풀을 새로 만듭니다.
+    """
+    try:
+        get_db_pool().wait(timeout=5)
+    except Exception as e:
+        logger.warning("초기화 단계의 DB 연결에 실패했습니다. 첫 요청 시 재시도합니다: %s", e)
+
+if register_before_snapshot is not None:
+    register_before_snapshot(shutdown_db_pool)
+    # 스냅샷에서 복원된 실행 환경에서는 새 연결로 풀을 다시 엽니다.
+    register_after_restore(warm_up_db_pool)
+
+# 콜드 스타트 시 init 단계에서 미리 DB에 연결해 첫 요청의 지연을 줄입니다.
+warm_up_db_pool()
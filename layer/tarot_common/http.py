@@ -0,0 +1,34 @@
+import base64
+import orjson
+
+# API Gateway 프록시 응답의 공통 헤더
+# 응답마다 새 딕셔너리를 만들지 않고 이 객체를 그대로 재사용하므로 수정하지 않아야 합니다.
+JSON_HEADERS = {
+    "Content-Type": "application/json",
+    "Access-Control-Allow-Origin": "*",
+}
+
+def get_raw_body(event, default="{}"):
+    """
+    요청 본문을 문자열로 반환합니다. API Gateway가 base64로 인코딩해 전달한 본문(isBase64Encoded)은 디코딩합니다.
+    잘못된 base64 또는 UTF-8이면 ValueError를 발생시킵니다.
+    """
+    body = event.get("body")
+    if not body:
+        return default
+    if event.get("isBase64Encoded"):
+        return base64.b64decode(body, validate=True).decode("utf-8")
+    return body
+
+def load_json_body(event):
+    """
+    요청 본문을 JSON으로 파싱합니다. 본문이 없으면 빈 딕셔너리를 반환합니다.
+    base64 본문은 디코딩한 bytes를 그대로 orjson에 넘겨 중간 문자열 변환을 하지 않습니다.
+    잘못된 base64 또는 JSON이면 ValueError(orjson.JSONDecodeError 포함)를 발생시킵니다.
+    """
+    body = event.get("body")
+    if not body:
+        return {}
+    if event.get("isBase64Encoded"):
+        body = base64.b64decode(body, validate=True)
+    return orjson.loads(body)
@@ -0,0 +1,8 @@
+-- 댓글 작성 시 SQS로 보낼 메시지를 댓글과 같은 트랜잭션에서 기록하는 outbox 테이블
+-- CreateCommentFunction이 기록하고, DrainCommentOutboxFunction이 SQS로 전송한 뒤 삭제합니다.
+CREATE TABLE IF NOT EXISTS public.comment_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    comment_id UUID NOT NULL REFERENCES public.comments (id) ON DELETE CASCADE,
+    payload JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,5 @@
+-- get_posts의 keyset 페이지네이션 (created_at DESC, id DESC)을 위한 부분 인덱스
+-- CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없으므로 SQL Editor가 아닌 psql로 단독 실행합니다.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS posts_created_at_id_idx
+    ON public.posts (created_at DESC, id DESC)
+    WHERE is_deleted = FALSE;